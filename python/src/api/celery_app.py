@@ -0,0 +1,46 @@
+"""
+Celery Application
+
+Background worker for CPU-heavy backtest jobs. Keeps the uvicorn event loop
+responsive by running backtests on a separate worker pool.
+
+Run a worker with:
+    celery -A src.api.celery_app worker --concurrency=4
+"""
+
+import os
+
+import numpy as np
+from celery import Celery
+
+# Redis serves as both broker and result backend
+broker_url = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+result_backend = os.getenv("CELERY_RESULT_BACKEND", broker_url)
+
+celery_app = Celery("backtest", broker=broker_url, backend=result_backend)
+
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    result_expires=3600,  # Keep results for 1 hour
+)
+
+
+@celery_app.task(name="backtest.run")
+def run_backtest_task(payload: dict) -> dict:
+    """
+    Run a backtest as a background job.
+
+    Takes the raw request payload (dict form of BacktestRequest) and returns
+    the response payload as a JSON-serializable dict.
+    """
+    # Imported lazily to avoid a circular import with the routes module
+    from src.api.routes.backtest import REQUEST_ADAPTER, execute_backtest
+
+    request = REQUEST_ADAPTER.validate_python(payload)
+    result = execute_backtest(request)
+
+    # Celery's JSON serializer can't encode numpy arrays
+    result["equity_curve"] = np.asarray(result["equity_curve"]).tolist()
+    return result
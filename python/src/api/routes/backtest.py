@@ -4,16 +4,29 @@ Backtest API Routes
 Endpoints for running backtests and optimizations.
 """
 
+import asyncio
+import time
+
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
+from celery.result import AsyncResult
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter
 import numpy as np
+import orjson
 
 # Import our backtest engine
 from src.backtest.engine import run_backtest, BacktestConfig as EngineConfig
+from src.backtest.metrics import get_annualization_factor
+from src.api.celery_app import celery_app, run_backtest_task
 
 router = APIRouter()
 
+# Stream responses whose equity curve exceeds this many points; below it a
+# single orjson.dumps is both faster and simpler
+STREAM_EQUITY_THRESHOLD = 50_000
+_STREAM_CHUNK_SIZE = 16_384
+
 
 # ============================================================================
 # Request/Response Models
@@ -103,6 +116,11 @@ class BacktestRequest(BaseModel):
     model_config = {"populate_by_name": True}
 
 
+# Validator compiled once at import; reused by the binary endpoint and the
+# Celery task instead of rebuilding the validation machinery per call
+REQUEST_ADAPTER = TypeAdapter(BacktestRequest)
+
+
 class TradeResult(BaseModel):
     """Individual trade result."""
 
@@ -147,12 +165,187 @@ class BacktestResponse(BaseModel):
     intercept: float  # Intercept (α) used in backtest
 
 
+class BacktestJobResponse(BaseModel):
+    """Response model for queued backtest jobs."""
+
+    job_id: str
+
+
+# ============================================================================
+# Core Logic
+# ============================================================================
+
+
+def execute_backtest(
+    request: BacktestRequest,
+    prices1: Optional[np.ndarray] = None,
+    prices2: Optional[np.ndarray] = None,
+) -> Dict[str, Any]:
+    """
+    Run a backtest synchronously and build the API response payload.
+
+    Shared by the inline `/run` endpoint, the binary endpoint, and the Celery
+    worker task, so all paths produce identical results.
+
+    Returns a plain dict (shape documented by BacktestResponse) so the
+    handler can hand it straight to orjson without a redundant Pydantic
+    validation pass over every trade and equity-curve float.
+
+    Args:
+        request: Validated backtest request
+        prices1/prices2: Optional pre-built numpy arrays (binary path);
+                         falls back to the JSON lists on the request
+
+    Raises:
+        ValueError: If the input price series are invalid.
+    """
+    # perf_counter: monotonic, so wall-clock jumps can't skew execution_time_ms
+    start_time = time.perf_counter()
+
+    # Validate input before allocating any arrays
+    n1 = len(prices1) if prices1 is not None else len(request.prices1)
+    n2 = len(prices2) if prices2 is not None else len(request.prices2)
+
+    if n1 != n2:
+        raise ValueError("Price series must have the same length")
+
+    if n1 < 30:
+        raise ValueError(
+            "Insufficient data for backtest (need at least 30 data points)"
+        )
+
+    # Convert prices to numpy arrays (asarray: no copy if already an ndarray)
+    if prices1 is None:
+        prices1 = np.asarray(request.prices1, dtype=np.float64)
+    if prices2 is None:
+        prices2 = np.asarray(request.prices2, dtype=np.float64)
+
+    # Convert API config to engine config
+    config = request.config or BacktestConfig()
+    engine_config = EngineConfig(
+        entry_threshold=config.entry_threshold,
+        exit_threshold=config.exit_threshold,
+        stop_loss=config.stop_loss,
+        commission_pct=config.commission_pct,
+        slippage_bps=config.slippage_bps,
+        use_rolling_hedge=config.use_rolling_hedge,
+        hedge_ratio_lookback_days=config.hedge_ratio_lookback_days,
+        hedge_recalc_interval_hours=config.hedge_recalc_interval_hours,
+        use_dynamic_hedge=config.use_dynamic_hedge,
+        lookback_hours=config.lookback_hours,
+    )
+
+    # Run backtest using our professional engine
+    result = run_backtest(
+        prices1=prices1,
+        prices2=prices2,
+        interval=request.interval,
+        config=engine_config,
+    )
+
+    # Convert trades to API format (plain dicts, shape of TradeResult)
+    trades = [
+        {
+            "entry_time": t["entry_time"],
+            "exit_time": t["exit_time"],
+            "side": t["side"],
+            "entry_z_score": t["entry_z_score"],
+            "exit_z_score": t["exit_z_score"],
+            "pnl_gross": t["pnl_gross"],
+            "pnl_net": t["pnl_net"],
+            "holding_period": t["holding_period"],
+            "exit_reason": t["exit_reason"],
+        }
+        for t in result.trades
+    ]
+
+    # Calculate annualized return for metrics
+    total_return = result.metrics["total_return"]
+    periods = len(result.daily_returns)
+    ann_factor = get_annualization_factor(request.interval)
+    annualized_return = (1 + total_return) ** (ann_factor / periods) - 1 if periods > 0 else 0.0
+
+    # Convert metrics to API format (plain dict, shape of BacktestMetrics)
+    metrics = {
+        "total_return": result.metrics["total_return"],
+        "annualized_return": annualized_return,
+        "sharpe": result.metrics["sharpe_ratio"],
+        "sortino": result.metrics["sortino_ratio"],
+        "max_drawdown": result.metrics["max_drawdown"],
+        "win_rate": result.metrics["win_rate"],
+        "profit_factor": result.metrics["profit_factor"],
+        "avg_trade_pnl": (result.metrics["avg_win"] * result.metrics["win_rate"] +
+                         result.metrics["avg_loss"] * (1 - result.metrics["win_rate"]))
+                         if result.metrics["total_trades"] > 0 else 0.0,
+        "avg_holding_period": result.metrics["avg_holding_period"],
+        "total_trades": result.metrics["total_trades"],
+        "winning_trades": result.metrics["winning_trades"],
+        "losing_trades": result.metrics["losing_trades"],
+    }
+
+    execution_time = (time.perf_counter() - start_time) * 1000
+
+    return {
+        "success": True,
+        "trades": trades,
+        "metrics": metrics,
+        # orjson serializes numpy arrays natively (OPT_SERIALIZE_NUMPY)
+        "equity_curve": result.equity_curve,
+        "config_used": config.model_dump(),
+        "execution_time_ms": execution_time,
+        "hedge_ratio": result.hedge_ratio,
+        "intercept": result.intercept,
+    }
+
+
+def _stream_backtest_payload(payload: Dict[str, Any]):
+    """
+    Yield the response JSON with the equity curve encoded chunk-wise.
+
+    Avoids materializing one giant JSON body for very long equity curves:
+    peak memory stays flat and the client sees the first bytes immediately.
+    """
+    equity_curve = np.asarray(payload.pop("equity_curve"))
+
+    # Everything except the equity curve, then splice the array in manually.
+    # The head still carries numpy scalars (metrics, hedge ratio), so it
+    # needs OPT_SERIALIZE_NUMPY just like the chunks
+    head = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    yield head[:-1] + b',"equity_curve":['
+
+    for offset in range(0, len(equity_curve), _STREAM_CHUNK_SIZE):
+        chunk = orjson.dumps(
+            equity_curve[offset : offset + _STREAM_CHUNK_SIZE],
+            option=orjson.OPT_SERIALIZE_NUMPY,
+        )
+        # Strip the [ ] of the chunk and join with commas
+        if offset == 0:
+            yield chunk[1:-1]
+        else:
+            yield b"," + chunk[1:-1]
+
+    yield b"]}"
+
+
+def _backtest_response(payload: Dict[str, Any]):
+    """Encode the payload, streaming the equity curve when it's very large."""
+    if len(payload["equity_curve"]) > STREAM_EQUITY_THRESHOLD:
+        return StreamingResponse(
+            _stream_backtest_payload(payload), media_type="application/json"
+        )
+    return ORJSONResponse(payload)
+
+
 # ============================================================================
 # Endpoints
 # ============================================================================
 
 
-@router.post("/run", response_model=BacktestResponse)
+# response_model=None: the payload is built by execute_backtest and handed
+# straight to orjson; re-validating every trade/float through Pydantic would
+# be a pure-Python pass over the whole payload. Schema kept in docs via
+# `responses`.
+@router.post("/run", response_model=None, responses={200: {"model": BacktestResponse}})
 async def run_backtest_endpoint(request: BacktestRequest):
     """
     Run backtest for a pairs trading strategy.
@@ -172,147 +365,121 @@ async def run_backtest_endpoint(request: BacktestRequest):
     - Performance metrics (Sharpe, Sortino, drawdown, etc.)
     - Equity curve for visualization
     """
-    import time
+    try:
+        # Offload the CPU-heavy backtest to the threadpool so the event loop
+        # stays responsive for other requests (e.g. /health)
+        payload = await asyncio.to_thread(execute_backtest, request)
+        return _backtest_response(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Backtest failed: {str(e)}")
+
+
+@router.post("/run-binary", response_model=None, responses={200: {"model": BacktestResponse}})
+async def run_backtest_binary_endpoint(request: Request):
+    """
+    Run a backtest from a raw binary price payload.
+
+    Avoids JSON-decoding and per-element Pydantic validation of the two price
+    arrays (~10-50x less parse CPU on long series, 3-4x smaller payload).
 
-    start_time = time.time()
+    **Body** (`application/octet-stream`): the two price arrays back to back,
+    little-endian floats.
+
+    **Headers:**
+    - `X-Backtest-Config`: JSON object with the non-price fields of the
+      regular `/run` request (`symbol1`, `symbol2`, `lookbackDays`,
+      `interval`, `config`, ...) plus:
+      - `prices1Length`: number of values in the first array
+      - `dtype` (optional): `"float64"` (default) or `"float32"`
+    """
+    config_header = request.headers.get("X-Backtest-Config")
+    if config_header is None:
+        raise HTTPException(status_code=400, detail="Missing X-Backtest-Config header")
 
     try:
-        # Validate input
-        if len(request.prices1) != len(request.prices2):
-            raise HTTPException(
-                status_code=400, detail="Price series must have the same length"
-            )
-
-        if len(request.prices1) < 30:
-            raise HTTPException(
-                status_code=400,
-                detail="Insufficient data for backtest (need at least 30 data points)",
-            )
-
-        # Convert prices to numpy arrays
-        prices1 = np.array(request.prices1)
-        prices2 = np.array(request.prices2)
-
-        # Convert API config to engine config
-        config = request.config or BacktestConfig()
-        engine_config = EngineConfig(
-            entry_threshold=config.entry_threshold,
-            exit_threshold=config.exit_threshold,
-            stop_loss=config.stop_loss,
-            commission_pct=config.commission_pct,
-            slippage_bps=config.slippage_bps,
-            use_rolling_hedge=config.use_rolling_hedge,
-            hedge_ratio_lookback_days=config.hedge_ratio_lookback_days,
-            hedge_recalc_interval_hours=config.hedge_recalc_interval_hours,
-            use_dynamic_hedge=config.use_dynamic_hedge,
-            lookback_hours=config.lookback_hours,
+        meta = orjson.loads(config_header)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON in X-Backtest-Config")
+
+    dtype_name = meta.pop("dtype", "float64")
+    if dtype_name not in ("float32", "float64"):
+        raise HTTPException(status_code=400, detail="dtype must be float32 or float64")
+    dtype = np.dtype(dtype_name)
+
+    n1 = meta.pop("prices1Length", None)
+    if n1 is None:
+        raise HTTPException(
+            status_code=400, detail="X-Backtest-Config must include prices1Length"
         )
 
-        # Run backtest using our professional engine
-        result = run_backtest(
-            prices1=prices1,
-            prices2=prices2,
-            interval=request.interval,
-            config=engine_config,
+    body = await request.body()
+    offset = int(n1) * dtype.itemsize
+    if offset > len(body) or len(body) % dtype.itemsize != 0:
+        raise HTTPException(
+            status_code=400, detail="Binary body size does not match prices1Length/dtype"
         )
 
-        # Convert trades to API format
-        trades = [
-            TradeResult(
-                entry_time=t["entry_time"],
-                exit_time=t["exit_time"],
-                side=t["side"],
-                entry_z_score=t["entry_z_score"],
-                exit_z_score=t["exit_z_score"],
-                pnl_gross=t["pnl_gross"],
-                pnl_net=t["pnl_net"],
-                holding_period=t["holding_period"],
-                exit_reason=t["exit_reason"],
-            )
-            for t in result.trades
-        ]
-
-        # Calculate annualized return for metrics
-        total_return = result.metrics["total_return"]
-        periods = len(result.daily_returns)
-        ann_factor = _get_annualization_factor(request.interval)
-        annualized_return = (1 + total_return) ** (ann_factor / periods) - 1 if periods > 0 else 0.0
-
-        # Convert metrics to API format
-        metrics = BacktestMetrics(
-            total_return=result.metrics["total_return"],
-            annualized_return=annualized_return,
-            sharpe=result.metrics["sharpe_ratio"],
-            sortino=result.metrics["sortino_ratio"],
-            max_drawdown=result.metrics["max_drawdown"],
-            win_rate=result.metrics["win_rate"],
-            profit_factor=result.metrics["profit_factor"],
-            avg_trade_pnl=(result.metrics["avg_win"] * result.metrics["win_rate"] +
-                          result.metrics["avg_loss"] * (1 - result.metrics["win_rate"]))
-                          if result.metrics["total_trades"] > 0 else 0.0,
-            avg_holding_period=result.metrics["avg_holding_period"],
-            total_trades=result.metrics["total_trades"],
-            winning_trades=result.metrics["winning_trades"],
-            losing_trades=result.metrics["losing_trades"],
-        )
+    # Zero-copy views over the request body
+    prices1 = np.frombuffer(body[:offset], dtype=dtype)
+    prices2 = np.frombuffer(body[offset:], dtype=dtype)
 
-        execution_time = (time.time() - start_time) * 1000
-
-        return BacktestResponse(
-            success=True,
-            trades=trades,
-            metrics=metrics,
-            equity_curve=result.equity_curve,
-            config_used=config,
-            execution_time_ms=execution_time,
-            hedge_ratio=result.hedge_ratio,
-            intercept=result.intercept,
-        )
+    # Validate only the lightweight metadata through Pydantic
+    backtest_request = REQUEST_ADAPTER.validate_python(
+        {**meta, "prices1": [], "prices2": []}
+    )
 
+    try:
+        payload = await asyncio.to_thread(
+            execute_backtest, backtest_request, prices1, prices2
+        )
+        return _backtest_response(payload)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Backtest failed: {str(e)}")
 
 
-@router.get("/health")
-async def health_check():
-    """Health check for backtest service."""
-    return {
-        "status": "healthy",
-        "engine": "vectorbt",
-        "version": "0.1.0",
-    }
+@router.post("/run-async", response_model=BacktestJobResponse)
+async def run_backtest_async_endpoint(request: BacktestRequest):
+    """
+    Enqueue a backtest on the Celery worker pool.
 
+    Returns immediately with a job id; poll `GET /run/{job_id}` for the result.
+    Use this instead of `/run` for long backtests so the API event loop stays
+    responsive and workers can scale horizontally.
+    """
+    task = run_backtest_task.delay(request.model_dump())
+    return BacktestJobResponse(job_id=task.id)
 
-# ============================================================================
-# Helper Functions
-# ============================================================================
 
+@router.get("/run/{job_id}")
+async def get_backtest_job(job_id: str):
+    """
+    Poll the status of a queued backtest job.
 
-def _get_annualization_factor(interval: str) -> float:
-    """Get annualization factor for a given interval."""
-    interval = interval.lower().strip()
+    **Returns:**
+    - `state`: PENDING, STARTED, SUCCESS, or FAILURE
+    - `result`: The backtest response once state is SUCCESS
+    """
+    result = AsyncResult(job_id, app=celery_app)
 
-    # Minute intervals
-    if interval.endswith('min') or interval.endswith('m'):
-        minutes = float(interval.rstrip('minm'))
-        return 365 * 24 * 60 / minutes
+    response: Dict[str, Any] = {"job_id": job_id, "state": result.state}
 
-    # Hour intervals
-    if interval.endswith('h'):
-        hours = float(interval.rstrip('h'))
-        return 365 * 24 / hours
+    if result.successful():
+        response["result"] = result.result
+    elif result.failed():
+        response["error"] = str(result.result)
 
-    # Day intervals
-    if interval.endswith('d'):
-        days = float(interval.rstrip('d'))
-        return 365 / days
+    return response
 
-    # Week intervals
-    if interval.endswith('w'):
-        weeks = float(interval.rstrip('w'))
-        return 52 / weeks
 
-    # Default to daily
-    return 365
+@router.get("/health")
+async def health_check():
+    """Health check for backtest service."""
+    return {
+        "status": "healthy",
+        "engine": "vectorbt",
+        "version": "0.1.0",
+    }
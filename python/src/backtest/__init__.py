@@ -4,12 +4,20 @@ Backtest Engine
 Professional statistical arbitrage backtesting engine using pandas and statsmodels.
 """
 
-from .engine import run_backtest, BacktestConfig, BacktestResult
+from .engine import (
+    run_backtest,
+    run_backtests_batch,
+    run_backtests_multi_pair,
+    BacktestConfig,
+    BacktestResult,
+)
 from .cointegration import engle_granger_test, calculate_z_score
 from .metrics import calculate_metrics
 
 __all__ = [
     "run_backtest",
+    "run_backtests_batch",
+    "run_backtests_multi_pair",
     "BacktestConfig",
     "BacktestResult",
     "engle_granger_test",
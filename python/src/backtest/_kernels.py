@@ -0,0 +1,445 @@
+"""
+Numba Kernels
+
+JIT-compiled hot loops for the backtest engine. Kept in one module so the
+compiled artifacts (cache=True) are shared across callers.
+
+All kernels declare explicit signatures, so they are compiled eagerly at
+import time and the result lands in Numba's on-disk cache — after the first
+build, importing this module loads machine code with no JIT pause on the
+first call. To prime the cache ahead of time (install step, CI, Docker
+build), run:
+
+    python -m src.backtest._kernels
+"""
+
+import numpy as np
+from numba import njit, prange, types
+
+# Shorthand for the contiguous array types the engine actually passes.
+# Price inputs are declared readonly: that accepts both writable arrays and
+# the read-only zero-copy views np.frombuffer produces (binary endpoint)
+_f4cr = types.Array(types.float32, 1, "C", readonly=True)
+_f4c2r = types.Array(types.float32, 2, "C", readonly=True)
+_f8cr = types.Array(types.float64, 1, "C", readonly=True)
+_f8c = types.Array(types.float64, 1, "C")
+_i8c = types.Array(types.int64, 1, "C")
+_i1c = types.Array(types.int8, 1, "C")
+_f8c2 = types.Array(types.float64, 2, "C")
+_i8c2 = types.Array(types.int64, 2, "C")
+_i1c2 = types.Array(types.int8, 2, "C")
+
+
+@njit(
+    types.Tuple((_f8c, types.float64, types.float64))(_f8cr, types.int64),
+    cache=True,
+)
+def rolling_zscore(spread: np.ndarray, lookback: int):
+    """
+    Single-pass rolling Z-Score.
+
+    Maintains running sum / sum-of-squares with add-new-drop-old updates, so
+    the whole series is one tight loop with no temporary arrays.
+
+    Z_t = (Spread_t - mean_window) / std_window (sample std, ddof=1)
+
+    Returns:
+        Tuple of (z_score_series, last_window_mean, last_window_std)
+    """
+    n = spread.shape[0]
+    z = np.zeros(n)
+    mean = 0.0
+    std = 0.0
+
+    if n < lookback or lookback < 2:
+        return z, mean, std
+
+    # Prime the first window
+    s = 0.0
+    s2 = 0.0
+    for i in range(lookback):
+        v = spread[i]
+        s += v
+        s2 += v * v
+
+    inv_w = 1.0 / lookback
+    for i in range(lookback - 1, n):
+        if i >= lookback:
+            v_new = spread[i]
+            v_old = spread[i - lookback]
+            s += v_new - v_old
+            s2 += v_new * v_new - v_old * v_old
+
+        mean = s * inv_w
+        var = (s2 - s * s * inv_w) / (lookback - 1)
+        if var > 0.0:
+            std = np.sqrt(var)
+            z[i] = (spread[i] - mean) / std
+        else:
+            std = 0.0
+
+    return z, mean, std
+
+
+# Encodings used by run_backtest_kernel (kept in sync with engine.py)
+SIDE_LONG_SPREAD = 0
+SIDE_SHORT_SPREAD = 1
+EXIT_MEAN_REVERSION = 0
+EXIT_STOP_LOSS = 1
+EXIT_END_OF_DATA = 2
+
+
+@njit(
+    types.Tuple(
+        (_i8c, _i8c, _i1c, _f8c, _f8c, _f8c, _f8c, _f8c, _f8c, _f8c, _f8c, _i1c, types.int64, _f8c)
+    )(
+        _f4cr,
+        _f4cr,
+        types.int64,
+        types.int64,
+        types.float64,
+        types.float64,
+        types.float64,
+        types.float64,
+        types.float64,
+        types.float64,
+    ),
+    cache=True,
+)
+def run_backtest_kernel(
+    prices1: np.ndarray,
+    prices2: np.ndarray,
+    lookback: int,
+    start_bar: int,
+    entry_threshold: float,
+    exit_threshold: float,
+    stop_loss: float,
+    round_trip_cost: float,
+    hedge_ratio: float,
+    intercept: float,
+):
+    """
+    Main simulation loop for a fixed hedge ratio, fully JIT-compiled.
+
+    Replaces the per-bar CPython dispatch (Z-score call, branch logic, PnL)
+    with one tight loop. The spread is never materialized: with the
+    incremental Z-score only spread[i] and spread[i - lookback] are read, so
+    Spread_t = P1_t - α - β * P2_t is computed on the fly from the price
+    arrays, halving memory traffic versus a build-then-scan pass.
+
+    Trades are returned as parallel arrays (struct-of-arrays) with `n_trades`
+    valid entries; sides and exit reasons use the SIDE_*/EXIT_* encodings
+    above.
+
+    Returns:
+        (entry_bars, exit_bars, sides, entry_zs, exit_zs,
+         entry_p1s, entry_p2s, exit_p1s, exit_p2s,
+         pnl_gross, pnl_net, exit_reasons, n_trades, returns)
+
+    `returns` has one slot per simulated bar; trade PnL is recorded in the
+    slot preceding the exit bar, matching the original Python loop.
+    """
+    n = prices1.shape[0]
+    n_bars = n - start_bar
+
+    # Worst case is an exit on every bar (re-entry on the exit bar is
+    # allowed) plus the end-of-data close; anything smaller risks an
+    # out-of-bounds native write since Numba doesn't bounds-check
+    cap = n_bars + 1
+    entry_bars = np.zeros(cap, dtype=np.int64)
+    exit_bars = np.zeros(cap, dtype=np.int64)
+    sides = np.zeros(cap, dtype=np.int8)
+    entry_zs = np.zeros(cap)
+    exit_zs = np.zeros(cap)
+    entry_p1s = np.zeros(cap)
+    entry_p2s = np.zeros(cap)
+    exit_p1s = np.zeros(cap)
+    exit_p2s = np.zeros(cap)
+    pnl_gross = np.zeros(cap)
+    pnl_net = np.zeros(cap)
+    exit_reasons = np.zeros(cap, dtype=np.int8)
+
+    returns = np.zeros(n_bars)
+
+    # PnL weights (beta-neutral, equal risk contribution)
+    abs_hedge = abs(hedge_ratio)
+    weight1 = 1.0 / (1.0 + abs_hedge)
+    weight2 = abs_hedge / (1.0 + abs_hedge)
+
+    n_trades = 0
+    is_open = False
+    side = 0
+    sign = 1.0  # +1 long spread, -1 short spread; set at entry
+    entry_bar = 0
+    entry_z = 0.0
+    entry_p1 = 0.0
+    entry_p2 = 0.0
+
+    inv_w = 1.0 / lookback
+    stop_loss_sq = stop_loss * stop_loss
+
+    # Prime the rolling sums over the window ending at start_bar, then update
+    # incrementally (add new, drop old): O(N) total instead of O(N*lookback)
+    z_sum = 0.0
+    z_sum2 = 0.0
+    for j in range(start_bar - lookback + 1, start_bar + 1):
+        v = prices1[j] - intercept - hedge_ratio * prices2[j]
+        z_sum += v
+        z_sum2 += v * v
+
+    for i in range(start_bar, n):
+        p1 = prices1[i]
+        p2 = prices2[i]
+        s_i = p1 - intercept - hedge_ratio * p2
+
+        if i > start_bar:
+            j = i - lookback
+            s_tail = prices1[j] - intercept - hedge_ratio * prices2[j]
+            z_sum += s_i - s_tail
+            z_sum2 += s_i * s_i - s_tail * s_tail
+
+        # Z-Score over the trailing window (sample std, ddof=1)
+        mean = z_sum * inv_w
+        var = (z_sum2 - z_sum * z_sum * inv_w) / (lookback - 1)
+        if var > 0.0:
+            z_score = (s_i - mean) / np.sqrt(var)
+        else:
+            z_score = 0.0
+
+        # === Check Exit Conditions ===
+        if is_open:
+            # Branchless exit tests: folding the long/short cases through
+            # `sign` removes the per-bar side branches.
+            #   Mean reversion: sign*z >= sign*exit_threshold
+            #     (long: z >= exit; short: z <= exit)
+            #   Stop loss: |z| >= stop AND z moved further against the entry
+            #     (z*z >= stop² avoids the abs; sign*(z - entry_z) < 0)
+            exit_mean_rev = sign * z_score >= sign * exit_threshold
+            exit_stop = (z_score * z_score >= stop_loss_sq) and (
+                sign * (z_score - entry_z) < 0.0
+            )
+
+            if exit_mean_rev or exit_stop:
+                exit_reason = EXIT_MEAN_REVERSION if exit_mean_rev else EXIT_STOP_LOSS
+
+                return1 = (p1 - entry_p1) / entry_p1
+                return2 = (p2 - entry_p2) / entry_p2
+                gross = sign * (weight1 * return1 - weight2 * return2)
+                net = gross - round_trip_cost
+
+                entry_bars[n_trades] = entry_bar
+                exit_bars[n_trades] = i
+                sides[n_trades] = side
+                entry_zs[n_trades] = entry_z
+                exit_zs[n_trades] = z_score
+                entry_p1s[n_trades] = entry_p1
+                entry_p2s[n_trades] = entry_p2
+                exit_p1s[n_trades] = p1
+                exit_p2s[n_trades] = p2
+                pnl_gross[n_trades] = gross
+                pnl_net[n_trades] = net
+                exit_reasons[n_trades] = exit_reason
+                n_trades += 1
+
+                # PnL lands in the previous bar's slot (original behavior)
+                returns[i - start_bar - 1] = net
+
+                is_open = False
+
+        # === Check Entry Conditions ===
+        if not is_open:
+            if z_score < -entry_threshold:
+                is_open = True
+                side = SIDE_LONG_SPREAD
+                sign = 1.0
+                entry_bar = i
+                entry_z = z_score
+                entry_p1 = p1
+                entry_p2 = p2
+            elif z_score > entry_threshold:
+                is_open = True
+                side = SIDE_SHORT_SPREAD
+                sign = -1.0
+                entry_bar = i
+                entry_z = z_score
+                entry_p1 = p1
+                entry_p2 = p2
+
+    # Close any open position at end of data
+    if is_open:
+        p1 = prices1[n - 1]
+        p2 = prices2[n - 1]
+        return1 = (p1 - entry_p1) / entry_p1
+        return2 = (p2 - entry_p2) / entry_p2
+        gross = sign * (weight1 * return1 - weight2 * return2)
+        net = gross - round_trip_cost
+
+        entry_bars[n_trades] = entry_bar
+        exit_bars[n_trades] = n - 1
+        sides[n_trades] = side
+        entry_zs[n_trades] = entry_z
+        exit_zs[n_trades] = 0.0
+        entry_p1s[n_trades] = entry_p1
+        entry_p2s[n_trades] = entry_p2
+        exit_p1s[n_trades] = p1
+        exit_p2s[n_trades] = p2
+        pnl_gross[n_trades] = gross
+        pnl_net[n_trades] = net
+        exit_reasons[n_trades] = EXIT_END_OF_DATA
+        n_trades += 1
+
+        returns[n_bars - 1] = net
+
+    return (
+        entry_bars,
+        exit_bars,
+        sides,
+        entry_zs,
+        exit_zs,
+        entry_p1s,
+        entry_p2s,
+        exit_p1s,
+        exit_p2s,
+        pnl_gross,
+        pnl_net,
+        exit_reasons,
+        n_trades,
+        returns,
+    )
+
+
+@njit(
+    types.Tuple(
+        (_i8c2, _i8c2, _i1c2, _f8c2, _f8c2, _f8c2, _f8c2, _f8c2, _f8c2, _f8c2, _f8c2, _i1c2, _i8c, _f8c2)
+    )(
+        _f4c2r,
+        _f4c2r,
+        _f8c,
+        _f8c,
+        types.int64,
+        types.int64,
+        types.float64,
+        types.float64,
+        types.float64,
+        types.float64,
+    ),
+    parallel=True,
+    cache=True,
+)
+def run_backtest_kernel_batch(
+    prices1_mat: np.ndarray,
+    prices2_mat: np.ndarray,
+    hedge_ratios: np.ndarray,
+    intercepts: np.ndarray,
+    lookback: int,
+    start_bar: int,
+    entry_threshold: float,
+    exit_threshold: float,
+    stop_loss: float,
+    round_trip_cost: float,
+):
+    """
+    Backtest M pairs in one call, parallelized over the pair axis.
+
+    Bars within a pair are inherently sequential, but pairs are independent,
+    so prange fans the per-pair simulations out across cores. Each lane runs
+    the exact single-pair kernel on its row and writes into its slice of the
+    stacked outputs, so per-pair results are identical to run_backtest_kernel.
+
+    Args:
+        prices1_mat, prices2_mat: (M, N) stacked price series
+        hedge_ratios, intercepts: per-pair regression parameters, shape (M,)
+
+    Returns:
+        Same columns as run_backtest_kernel, each stacked to (M, cap) /
+        (M, n_bars), plus an (M,) array of trade counts.
+    """
+    m = prices1_mat.shape[0]
+    n = prices1_mat.shape[1]
+    n_bars = n - start_bar
+    # Must match the single-pair kernel: one exit per bar plus the
+    # end-of-data close, or a lane overruns its output slice
+    cap = n_bars + 1
+
+    entry_bars = np.zeros((m, cap), dtype=np.int64)
+    exit_bars = np.zeros((m, cap), dtype=np.int64)
+    sides = np.zeros((m, cap), dtype=np.int8)
+    entry_zs = np.zeros((m, cap))
+    exit_zs = np.zeros((m, cap))
+    entry_p1s = np.zeros((m, cap))
+    entry_p2s = np.zeros((m, cap))
+    exit_p1s = np.zeros((m, cap))
+    exit_p2s = np.zeros((m, cap))
+    pnl_gross = np.zeros((m, cap))
+    pnl_net = np.zeros((m, cap))
+    exit_reasons = np.zeros((m, cap), dtype=np.int8)
+    n_trades = np.zeros(m, dtype=np.int64)
+    returns = np.zeros((m, n_bars))
+
+    for p in prange(m):
+        res = run_backtest_kernel(
+            prices1_mat[p],
+            prices2_mat[p],
+            lookback,
+            start_bar,
+            entry_threshold,
+            exit_threshold,
+            stop_loss,
+            round_trip_cost,
+            hedge_ratios[p],
+            intercepts[p],
+        )
+        k = res[12]
+        n_trades[p] = k
+        entry_bars[p, :k] = res[0][:k]
+        exit_bars[p, :k] = res[1][:k]
+        sides[p, :k] = res[2][:k]
+        entry_zs[p, :k] = res[3][:k]
+        exit_zs[p, :k] = res[4][:k]
+        entry_p1s[p, :k] = res[5][:k]
+        entry_p2s[p, :k] = res[6][:k]
+        exit_p1s[p, :k] = res[7][:k]
+        exit_p2s[p, :k] = res[8][:k]
+        pnl_gross[p, :k] = res[9][:k]
+        pnl_net[p, :k] = res[10][:k]
+        exit_reasons[p, :k] = res[11][:k]
+        returns[p] = res[13]
+
+    return (
+        entry_bars,
+        exit_bars,
+        sides,
+        entry_zs,
+        exit_zs,
+        entry_p1s,
+        entry_p2s,
+        exit_p1s,
+        exit_p2s,
+        pnl_gross,
+        pnl_net,
+        exit_reasons,
+        n_trades,
+        returns,
+    )
+
+
+@njit(_f8c(_f8cr, _f8cr, types.float64, types.float64), cache=True)
+def build_spread_kernel(
+    prices_y: np.ndarray,
+    prices_x: np.ndarray,
+    hedge_ratio: float,
+    intercept: float,
+) -> np.ndarray:
+    """Spread_t = Y_t - α - β * X_t, fused into one loop (no temporaries)."""
+    n = prices_y.shape[0]
+    out = np.empty(n)
+    for i in range(n):
+        out[i] = prices_y[i] - intercept - hedge_ratio * prices_x[i]
+    return out
+
+
+if __name__ == "__main__":
+    # Importing this module compiles every kernel (explicit signatures force
+    # eager compilation) and cache=True persists the machine code, so simply
+    # running it as a script primes the on-disk cache
+    print("Numba kernels compiled and cached.")
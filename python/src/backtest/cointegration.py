@@ -4,13 +4,34 @@ Cointegration Module
 Implements Engle-Granger two-step cointegration test using statsmodels.
 """
 
+import hashlib
+
 import numpy as np
-import pandas as pd
-from statsmodels.regression.linear_model import OLS
 from statsmodels.tsa.stattools import adfuller
 from typing import Dict, Tuple, Optional
 from dataclasses import dataclass
-
+from functools import lru_cache
+
+from ._kernels import rolling_zscore, build_spread_kernel
+
+
+# Known intervals resolved by direct lookup; the string parser below is only
+# a fallback for unusual interval strings
+INTERVAL_MINUTES = {
+    "1min": 1.0,
+    "3min": 3.0,
+    "5min": 5.0,
+    "15min": 15.0,
+    "30min": 30.0,
+    "1h": 60.0,
+    "2h": 120.0,
+    "4h": 240.0,
+    "6h": 360.0,
+    "12h": 720.0,
+    "1d": 1440.0,
+    "3d": 4320.0,
+    "1w": 10080.0,
+}
 
 # MacKinnon (1991) critical values for cointegration test
 # More conservative than standard ADF critical values
@@ -28,6 +49,13 @@ COINTEGRATION_CRITICAL_VALUES = {
 }
 
 
+# Memo cache for engle_granger_test keyed by input digests. The cointegrating
+# regression doesn't depend on strategy params, so parameter sweeps re-fit the
+# same pair hundreds of times; caching makes that step 1x instead of Nx.
+_EG_CACHE_MAX = 128
+_eg_cache: Dict[Tuple[str, str, Optional[int]], "EngleGrangerResult"] = {}
+
+
 @dataclass
 class EngleGrangerResult:
     """Result from Engle-Granger cointegration test"""
@@ -71,16 +99,38 @@ def engle_granger_test(
     if len(prices_y) < 20:
         raise ValueError("Need at least 20 observations")
 
-    # Step 1: Cointegrating regression using OLS
-    # Y = α + βX + u
-    X = np.column_stack([np.ones(len(prices_x)), prices_x])
-    model = OLS(prices_y, X)
-    results = model.fit()
+    prices_y = np.ascontiguousarray(prices_y, dtype=np.float64)
+    prices_x = np.ascontiguousarray(prices_x, dtype=np.float64)
 
-    intercept = results.params[0]
-    hedge_ratio = results.params[1]
-    residuals = results.resid
-    r_squared = results.rsquared
+    # Check the memo cache (keyed by content digest of both series)
+    cache_key = (
+        hashlib.sha1(prices_y.tobytes()).hexdigest(),
+        hashlib.sha1(prices_x.tobytes()).hexdigest(),
+        maxlag,
+    )
+    cached = _eg_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Step 1: Cointegrating regression Y = α + βX + u
+    # Closed-form simple OLS: β = Cov(X, Y) / Var(X), α = Ȳ - β·X̄
+    # Equivalent to statsmodels OLS but skips its Model/Results machinery
+    x_mean = prices_x.mean()
+    y_mean = prices_y.mean()
+    xc = prices_x - x_mean
+    yc = prices_y - y_mean
+
+    sxx = xc @ xc
+    if sxx == 0:
+        raise ValueError("X series is constant; cointegrating regression is undefined")
+
+    hedge_ratio = (xc @ yc) / sxx
+    intercept = y_mean - hedge_ratio * x_mean
+    residuals = prices_y - intercept - hedge_ratio * prices_x
+
+    # R² = 1 - SSR/SST
+    sst = yc @ yc
+    r_squared = 1.0 - (residuals @ residuals) / sst if sst > 0 else 0.0
 
     # Step 2: ADF test on residuals
     # Use "n" (no constant) because residuals have mean ~0 by construction
@@ -104,7 +154,7 @@ def engle_granger_test(
     # Note: ADF p-value is for standard ADF, not cointegration test
     p_value = _approximate_cointegration_pvalue(adf_statistic, 2)
 
-    return EngleGrangerResult(
+    result = EngleGrangerResult(
         statistic=adf_statistic,
         p_value=p_value,
         is_cointegrated=is_cointegrated,
@@ -115,6 +165,13 @@ def engle_granger_test(
         critical_values=critical_values,
     )
 
+    # Bounded cache: wipe wholesale rather than tracking LRU order
+    if len(_eg_cache) >= _EG_CACHE_MAX:
+        _eg_cache.clear()
+    _eg_cache[cache_key] = result
+
+    return result
+
 
 def _approximate_cointegration_pvalue(t_stat: float, num_vars: int) -> float:
     """
@@ -163,7 +220,12 @@ def build_spread(
     Returns:
         Spread series as numpy array
     """
-    return prices_y - intercept - hedge_ratio * prices_x
+    return build_spread_kernel(
+        np.ascontiguousarray(prices_y, dtype=np.float64),
+        np.ascontiguousarray(prices_x, dtype=np.float64),
+        float(hedge_ratio),
+        float(intercept),
+    )
 
 
 def calculate_z_score(
@@ -187,19 +249,14 @@ def calculate_z_score(
         return np.array([]), 0.0, 0.0, 1.0
 
     if lookback and lookback < len(spread):
-        # Rolling Z-Score using pandas for efficiency
-        spread_series = pd.Series(spread)
-        rolling_mean = spread_series.rolling(window=lookback).mean()
-        rolling_std = spread_series.rolling(window=lookback).std()
-
-        # Calculate Z-Score
-        z_score = (spread_series - rolling_mean) / rolling_std
-        z_score = z_score.fillna(0).values
+        # Rolling Z-Score in a single JIT-compiled pass (see _kernels.py):
+        # running sum / sum-of-squares, no temporary arrays
+        z_score, mean_spread, std_spread = rolling_zscore(
+            np.ascontiguousarray(spread, dtype=np.float64), lookback
+        )
 
         # Get current values (last window)
         current_z_score = z_score[-1] if len(z_score) > 0 else 0.0
-        mean_spread = rolling_mean.iloc[-1] if len(rolling_mean) > 0 else 0.0
-        std_spread = rolling_std.iloc[-1] if len(rolling_std) > 0 else 1.0
 
     else:
         # Static Z-Score using all data
@@ -250,10 +307,13 @@ def calculate_lookback_bars(lookback_hours: float, interval: str) -> int:
     return max(10, bars)
 
 
+@lru_cache(maxsize=32)
 def _parse_interval_to_minutes(interval: str) -> float:
     """
     Parse interval string to minutes
 
+    Memoized: the interval domain is tiny and this runs on every request.
+
     Supported formats:
     - '5min' or '5m' → 5 minutes
     - '1h' → 60 minutes
@@ -261,6 +321,10 @@ def _parse_interval_to_minutes(interval: str) -> float:
     - '1d' → 1440 minutes
     - '1w' → 10080 minutes
     """
+    minutes = INTERVAL_MINUTES.get(interval)
+    if minutes is not None:
+        return minutes
+
     interval = interval.lower().strip()
 
     # Minute intervals
@@ -4,27 +4,57 @@ Backtest Engine
 Professional pairs trading backtest engine using pandas, statsmodels, and numba.
 """
 
+import logging
+import multiprocessing
+
 import numpy as np
 import pandas as pd
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional, Literal
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import List, Dict, Optional, Literal, Tuple
 
 from .cointegration import (
     engle_granger_test,
-    build_spread,
-    calculate_z_score,
     calculate_lookback_bars,
 )
 from .execution import (
     ExecutionCosts,
     BINANCE_FUTURES_COSTS,
-    calculate_pair_trade_pnl,
+    calculate_pair_trade_pnl_signed,
+    calculate_pnl_weights,
     calculate_round_trip_costs,
 )
 from .metrics import calculate_metrics, BacktestMetrics
+from ._kernels import run_backtest_kernel, run_backtest_kernel_batch
+
+# Decode kernel enums back to the string literals used in Trade records
+_SIDE_NAMES = ("long_spread", "short_spread")
+_EXIT_REASON_NAMES = ("mean_reversion", "stop_loss", "end_of_data")
+
+# Debug output is lazy (%-style args) so sweeps with logging at INFO+ pay
+# nothing for string formatting or stdout flushes
+logger = logging.getLogger(__name__)
+
 
+@lru_cache(maxsize=None)
+def _field_names(cls) -> tuple:
+    """Field names of a dataclass, resolved once per class"""
+    return tuple(f.name for f in fields(cls))
 
-@dataclass
+
+def _shallow_asdict(obj) -> Dict:
+    """
+    Flat dict of a dataclass instance.
+
+    All dataclasses serialized here hold only scalars and strings, so the
+    recursive deep copy dataclasses.asdict performs is wasted work; in sweeps
+    building one result per run it shows up in profiles.
+    """
+    return {name: getattr(obj, name) for name in _field_names(type(obj))}
+
+
+@dataclass(slots=True)
 class BacktestConfig:
     """Backtest configuration"""
 
@@ -42,7 +72,7 @@ class BacktestConfig:
     force_intercept: Optional[float] = None  # Override intercept
 
 
-@dataclass
+@dataclass(slots=True)
 class Trade:
     """Single trade record"""
 
@@ -61,14 +91,14 @@ class Trade:
     exit_reason: Literal["mean_reversion", "stop_loss", "end_of_data"]
 
 
-@dataclass
+@dataclass(slots=True)
 class BacktestResult:
     """Complete backtest result"""
 
     trades: List[Dict]  # List of trade dicts for JSON serialization
-    equity_curve: List[float]
+    equity_curve: np.ndarray  # Starts at 1.0; orjson serializes it natively
     metrics: Dict  # Metrics dict for JSON serialization
-    daily_returns: List[float]
+    daily_returns: np.ndarray  # One return per simulated bar
     config: Dict  # Config dict for JSON serialization
     hedge_ratio: float  # Hedge ratio (β) used
     intercept: float  # Intercept (α) used
@@ -153,10 +183,21 @@ def run_backtest(
     if len(prices1) != len(prices2):
         raise ValueError("Price series must have same length")
 
+    # The simulation is memory-bound (streaming reads of two price vectors),
+    # so float32 halves the bytes moved; crypto prices fit comfortably in
+    # float32, and the kernel keeps its Z-score accumulators in float64
+    prices1 = np.ascontiguousarray(prices1, dtype=np.float32)
+    prices2 = np.ascontiguousarray(prices2, dtype=np.float32)
+
     # Calculate lookback in bars based on time (fixes the interval bug!)
     if config.lookback_hours:
         lookback_bars = calculate_lookback_bars(config.lookback_hours, interval)
-        print(f"[Backtest] Z-Score Lookback: {config.lookback_hours}h = {lookback_bars} bars @ {interval}")
+        logger.debug(
+            "[Backtest] Z-Score Lookback: %sh = %d bars @ %s",
+            config.lookback_hours,
+            lookback_bars,
+            interval,
+        )
     else:
         lookback_bars = 20  # Fallback to fixed bars if no time specified
 
@@ -167,20 +208,27 @@ def run_backtest(
         # Convert days to hours to bars
         hedge_ratio_hours = config.hedge_ratio_lookback_days * 24
         hedge_ratio_lookback_bars = calculate_lookback_bars(hedge_ratio_hours, interval)
-        print(f"[Backtest] Hedge Ratio Lookback: {config.hedge_ratio_lookback_days}d = {hedge_ratio_lookback_bars} bars @ {interval}")
+        logger.debug(
+            "[Backtest] Hedge Ratio Lookback: %sd = %d bars @ %s",
+            config.hedge_ratio_lookback_days,
+            hedge_ratio_lookback_bars,
+            interval,
+        )
 
         # Calculate recalculation interval (performance optimization)
         if config.hedge_recalc_interval_hours and config.hedge_recalc_interval_hours > 0:
             hedge_recalc_interval_bars = calculate_lookback_bars(config.hedge_recalc_interval_hours, interval)
-            print(f"[Backtest] Hedge Ratio Recalc Interval: {config.hedge_recalc_interval_hours}h = {hedge_recalc_interval_bars} bars")
+            logger.debug(
+                "[Backtest] Hedge Ratio Recalc Interval: %sh = %d bars",
+                config.hedge_recalc_interval_hours,
+                hedge_recalc_interval_bars,
+            )
 
     min_bars_needed = max(lookback_bars, hedge_ratio_lookback_bars or 0) + 10
     if len(prices1) < min_bars_needed:
         raise ValueError(f"Insufficient data: need at least {min_bars_needed} bars")
 
     n = len(prices1)
-    trades: List[Trade] = []
-    daily_returns: List[float] = []
 
     # Execution costs
     costs = ExecutionCosts(
@@ -191,35 +239,399 @@ def run_backtest(
     # Initialize hedge ratio and intercept
     hedge_ratio = 0.0
     intercept = 0.0
-    spread = np.zeros(n)  # Pre-allocate spread array
 
-    # Calculate initial hedge ratio
+    # Calculate initial hedge ratio (the fixed-hedge kernel computes the
+    # spread on the fly, so no spread array is materialized here)
     if config.force_hedge_ratio is not None and config.force_intercept is not None:
         # Use forced parameters (for synthetic tests)
         hedge_ratio = config.force_hedge_ratio
         intercept = config.force_intercept
-        spread = build_spread(prices1, prices2, hedge_ratio, intercept)
-        print(f"[Backtest] Using FORCED parameters (synthetic test)")
-        print(f"[Backtest] Hedge Ratio (β): {hedge_ratio:.4f}")
-        print(f"[Backtest] Intercept (α): {intercept:.4f}")
+        logger.debug("[Backtest] Using FORCED parameters (synthetic test)")
+        logger.debug("[Backtest] Hedge Ratio (β): %.4f", hedge_ratio)
+        logger.debug("[Backtest] Intercept (α): %.4f", intercept)
     elif not config.use_rolling_hedge:
         # Static hedge ratio: Calculate from data using Engle-Granger on full dataset
         # Note: This creates look-ahead bias and is only suitable for backtesting
         eg_result = engle_granger_test(prices1, prices2)
         hedge_ratio = eg_result.hedge_ratio
         intercept = eg_result.intercept
-        spread = build_spread(prices1, prices2, hedge_ratio, intercept)
-
-        print(f"[Backtest] STATIC Hedge Ratio (Engle-Granger on full dataset):")
-        print(f"  Hedge Ratio (β): {hedge_ratio:.4f}")
-        print(f"  Intercept (α): {intercept:.4f}")
-        print(f"  ADF Statistic: {eg_result.statistic:.4f}")
-        print(f"  P-Value: {eg_result.p_value:.4f}")
-        print(f"  Is Cointegrated: {eg_result.is_cointegrated}")
-        print(f"  R²: {eg_result.r_squared:.4f}")
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[Backtest] STATIC Hedge Ratio (Engle-Granger on full dataset):")
+            logger.debug("  Hedge Ratio (β): %.4f", hedge_ratio)
+            logger.debug("  Intercept (α): %.4f", intercept)
+            logger.debug("  ADF Statistic: %.4f", eg_result.statistic)
+            logger.debug("  P-Value: %.4f", eg_result.p_value)
+            logger.debug("  Is Cointegrated: %s", eg_result.is_cointegrated)
+            logger.debug("  R²: %.4f", eg_result.r_squared)
     else:
         # Rolling hedge ratio: Will be calculated in loop
-        print(f"[Backtest] ROLLING Hedge Ratio (OLS with {config.hedge_ratio_lookback_days}d lookback)")
+        logger.debug(
+            "[Backtest] ROLLING Hedge Ratio (OLS with %sd lookback)",
+            config.hedge_ratio_lookback_days,
+        )
+
+    # Main simulation
+    start_bar = max(lookback_bars, hedge_ratio_lookback_bars or 0)
+
+    if config.use_rolling_hedge and hedge_ratio_lookback_bars:
+        # Rolling hedge ratio needs per-window OLS refits, so it stays in Python
+        trades, daily_returns, hedge_ratio, intercept, equity = _run_rolling_hedge_loop(
+            prices1,
+            prices2,
+            np.zeros(n),  # Spread filled in as the loop refits the regression
+            config,
+            costs,
+            lookback_bars,
+            hedge_ratio_lookback_bars,
+            hedge_recalc_interval_bars,
+            start_bar,
+        )
+        trade_dicts = [_shallow_asdict(t) for t in trades]
+    else:
+        # Fixed hedge ratio: the whole per-bar loop runs JIT-compiled
+        round_trip_cost = calculate_round_trip_costs(costs)
+        (
+            entry_bars,
+            exit_bars,
+            sides,
+            entry_zs,
+            exit_zs,
+            entry_p1s,
+            entry_p2s,
+            exit_p1s,
+            exit_p2s,
+            pnl_gross_arr,
+            pnl_net_arr,
+            exit_reasons,
+            n_trades,
+            returns,
+        ) = run_backtest_kernel(
+            prices1,
+            prices2,
+            lookback_bars,
+            start_bar,
+            config.entry_threshold,
+            config.exit_threshold,
+            config.stop_loss,
+            round_trip_cost,
+            hedge_ratio,
+            intercept,
+        )
+
+        # Build trade dicts straight from the kernel's column arrays; going
+        # through Trade dataclasses plus asdict() would only add per-trade
+        # instantiation and recursive-copy overhead
+        trade_dicts = _trade_dicts_from_columns(
+            entry_bars,
+            exit_bars,
+            sides,
+            entry_zs,
+            exit_zs,
+            entry_p1s,
+            entry_p2s,
+            exit_p1s,
+            exit_p2s,
+            pnl_gross_arr,
+            pnl_net_arr,
+            exit_reasons,
+            n_trades,
+        )
+        daily_returns = returns
+        equity = float(np.prod(1.0 + returns))
+
+        # Debug logging for first 3 trades
+        if logger.isEnabledFor(logging.DEBUG):
+            for k, trade in enumerate(trade_dicts[:3]):
+                logger.debug("\n[Trade %d] Exit:", k + 1)
+                logger.debug("  Side: %s", trade["side"])
+                logger.debug("  Entry Bar: %d, Exit Bar: %d", trade["entry_time"], trade["exit_time"])
+                logger.debug("  Entry Z: %.2f, Exit Z: %.2f", trade["entry_z_score"], trade["exit_z_score"])
+                logger.debug("  Entry Prices: P1=%.2f, P2=%.2f", trade["entry_price1"], trade["entry_price2"])
+                logger.debug("  Exit Prices: P1=%.2f, P2=%.2f", trade["exit_price1"], trade["exit_price2"])
+                logger.debug("  Hedge Ratio: %.4f", hedge_ratio)
+                logger.debug("  Gross PnL: %.2f%%", trade["pnl_gross"] * 100)
+                logger.debug("  Net PnL: %.2f%%", trade["pnl_net"] * 100)
+                logger.debug("  Exit Reason: %s", trade["exit_reason"])
+
+    # Build equity curve with a single vectorized cumulative product
+    returns_array = np.asarray(daily_returns, dtype=np.float64)
+    equity_curve = np.empty(len(returns_array) + 1)
+    equity_curve[0] = 1.0
+    np.cumprod(1.0 + returns_array, out=equity_curve[1:])
+
+    # Calculate metrics
+    metrics = calculate_metrics(trade_dicts, returns_array, interval)
+
+    # Summary logging
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("\n[Backtest] Complete:")
+        logger.debug("  Total Trades: %d", len(trade_dicts))
+        logger.debug("  Win Rate: %.1f%%", metrics.win_rate * 100)
+        logger.debug("  Total Return: %.2f%%", metrics.total_return * 100)
+        logger.debug("  Profit Factor: %.2f", metrics.profit_factor)
+        logger.debug("  Sharpe Ratio: %.2f", metrics.sharpe_ratio)
+        logger.debug("  Max Drawdown: %.2f%%", metrics.max_drawdown * 100)
+        logger.debug("  Final Equity: %.4f", equity)
+
+    return BacktestResult(
+        trades=trade_dicts,
+        equity_curve=equity_curve,
+        metrics=_shallow_asdict(metrics),
+        daily_returns=returns_array,
+        config=_shallow_asdict(config),
+        hedge_ratio=hedge_ratio,
+        intercept=intercept,
+    )
+
+
+def _trade_dicts_from_columns(
+    entry_bars,
+    exit_bars,
+    sides,
+    entry_zs,
+    exit_zs,
+    entry_p1s,
+    entry_p2s,
+    exit_p1s,
+    exit_p2s,
+    pnl_gross,
+    pnl_net,
+    exit_reasons,
+    n_trades: int,
+) -> List[Dict]:
+    """Decode a kernel's struct-of-arrays trade output into trade dicts"""
+    return [
+        {
+            "entry_time": int(entry_bars[k]),
+            "exit_time": int(exit_bars[k]),
+            "side": _SIDE_NAMES[sides[k]],
+            "entry_z_score": float(entry_zs[k]),
+            "exit_z_score": float(exit_zs[k]),
+            "entry_price1": float(entry_p1s[k]),
+            "entry_price2": float(entry_p2s[k]),
+            "exit_price1": float(exit_p1s[k]),
+            "exit_price2": float(exit_p2s[k]),
+            "pnl_gross": float(pnl_gross[k]),
+            "pnl_net": float(pnl_net[k]),
+            "holding_period": int(exit_bars[k] - entry_bars[k]),
+            "exit_reason": _EXIT_REASON_NAMES[exit_reasons[k]],
+        }
+        for k in range(n_trades)
+    ]
+
+
+def run_backtests_multi_pair(
+    prices1_mat: np.ndarray,
+    prices2_mat: np.ndarray,
+    interval: str = "1d",
+    config: Optional[BacktestConfig] = None,
+) -> List[BacktestResult]:
+    """
+    Backtest many pairs in a single kernel call, parallelized over pairs.
+
+    Takes price series stacked into (M, N) matrices (np.stack over the pair
+    axis) and runs all M fixed-hedge simulations inside one parallel Numba
+    kernel, which spreads the work across cores without the process-spawn
+    and pickling overhead of run_backtests_batch. All pairs share one config
+    and bar interval; use run_backtests_batch when jobs differ in shape or
+    configuration.
+
+    Args:
+        prices1_mat: (M, N) matrix, one row per pair for asset 1
+        prices2_mat: (M, N) matrix, one row per pair for asset 2
+        interval: Bar interval shared by all pairs
+        config: Backtest configuration shared by all pairs (fixed hedge only)
+
+    Returns:
+        List of M BacktestResult, one per row
+    """
+    if config is None:
+        config = BacktestConfig()
+    if config.use_rolling_hedge:
+        raise ValueError("Multi-pair batching supports fixed hedge ratios only")
+    if prices1_mat.shape != prices2_mat.shape or prices1_mat.ndim != 2:
+        raise ValueError("Price matrices must both have shape (n_pairs, n_bars)")
+
+    m = prices1_mat.shape[0]
+    if m == 0:
+        return []
+
+    prices1_mat = np.ascontiguousarray(prices1_mat, dtype=np.float32)
+    prices2_mat = np.ascontiguousarray(prices2_mat, dtype=np.float32)
+
+    if config.lookback_hours:
+        lookback_bars = calculate_lookback_bars(config.lookback_hours, interval)
+    else:
+        lookback_bars = 20
+
+    min_bars_needed = lookback_bars + 10
+    if prices1_mat.shape[1] < min_bars_needed:
+        raise ValueError(f"Insufficient data: need at least {min_bars_needed} bars")
+
+    # Per-pair regression parameters (cheap relative to the simulations)
+    hedge_ratios = np.empty(m)
+    intercepts = np.empty(m)
+    if config.force_hedge_ratio is not None and config.force_intercept is not None:
+        hedge_ratios[:] = config.force_hedge_ratio
+        intercepts[:] = config.force_intercept
+    else:
+        for p in range(m):
+            eg_result = engle_granger_test(prices1_mat[p], prices2_mat[p])
+            hedge_ratios[p] = eg_result.hedge_ratio
+            intercepts[p] = eg_result.intercept
+
+    start_bar = lookback_bars
+    round_trip_cost = calculate_round_trip_costs(
+        ExecutionCosts(
+            commission_pct=config.commission_pct,
+            slippage_bps=config.slippage_bps,
+        )
+    )
+
+    (
+        entry_bars,
+        exit_bars,
+        sides,
+        entry_zs,
+        exit_zs,
+        entry_p1s,
+        entry_p2s,
+        exit_p1s,
+        exit_p2s,
+        pnl_gross,
+        pnl_net,
+        exit_reasons,
+        n_trades,
+        returns,
+    ) = run_backtest_kernel_batch(
+        prices1_mat,
+        prices2_mat,
+        hedge_ratios,
+        intercepts,
+        lookback_bars,
+        start_bar,
+        config.entry_threshold,
+        config.exit_threshold,
+        config.stop_loss,
+        round_trip_cost,
+    )
+
+    config_dict = _shallow_asdict(config)
+    results: List[BacktestResult] = []
+    for p in range(m):
+        trade_dicts = _trade_dicts_from_columns(
+            entry_bars[p],
+            exit_bars[p],
+            sides[p],
+            entry_zs[p],
+            exit_zs[p],
+            entry_p1s[p],
+            entry_p2s[p],
+            exit_p1s[p],
+            exit_p2s[p],
+            pnl_gross[p],
+            pnl_net[p],
+            exit_reasons[p],
+            int(n_trades[p]),
+        )
+        pair_returns = returns[p]
+        equity_curve = np.empty(len(pair_returns) + 1)
+        equity_curve[0] = 1.0
+        np.cumprod(1.0 + pair_returns, out=equity_curve[1:])
+        metrics = calculate_metrics(trade_dicts, pair_returns, interval)
+        results.append(
+            BacktestResult(
+                trades=trade_dicts,
+                equity_curve=equity_curve,
+                metrics=_shallow_asdict(metrics),
+                daily_returns=pair_returns,
+                config=dict(config_dict),
+                hedge_ratio=float(hedge_ratios[p]),
+                intercept=float(intercepts[p]),
+            )
+        )
+    return results
+
+
+def _warm_worker():
+    """
+    Process-pool initializer: trigger the Numba kernel load once per worker.
+
+    With cache=True the compiled artifact is read from disk rather than
+    recompiled, but paying that cost up front keeps it out of the first job.
+    """
+    tiny = np.arange(16, dtype=np.float32)
+    run_backtest_kernel(tiny, tiny, 4, 4, 2.0, 0.0, 3.0, 0.0, 1.0, 0.0)
+
+
+def _run_backtest_star(job) -> BacktestResult:
+    """Unpack one (prices1, prices2, interval, config) job for executor.map"""
+    prices1, prices2, interval, config = job
+    return run_backtest(prices1, prices2, interval, config)
+
+
+def run_backtests_batch(
+    jobs: List[Tuple[np.ndarray, np.ndarray, str, Optional[BacktestConfig]]],
+    max_workers: Optional[int] = None,
+) -> List[BacktestResult]:
+    """
+    Run independent backtests in parallel across CPU cores.
+
+    Each job is a (prices1, prices2, interval, config) tuple, mirroring the
+    run_backtest signature. Backtests share nothing, so parameter sweeps and
+    multi-pair scans scale near-linearly with core count.
+
+    Args:
+        jobs: List of (prices1, prices2, interval, config) tuples
+        max_workers: Process count (default: os.cpu_count())
+
+    Returns:
+        List of BacktestResult in the same order as jobs
+    """
+    if not jobs:
+        return []
+
+    # Spawn, not fork: importing the kernels initializes Numba's native
+    # threading layer (the batch kernel is parallel=True), and forking a
+    # process that has done so deadlocks per Numba's fork-safety rules
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_worker,
+    ) as executor:
+        return list(executor.map(_run_backtest_star, jobs))
+
+
+def _run_rolling_hedge_loop(
+    prices1: np.ndarray,
+    prices2: np.ndarray,
+    spread: np.ndarray,
+    config: BacktestConfig,
+    costs: ExecutionCosts,
+    lookback_bars: int,
+    hedge_ratio_lookback_bars: int,
+    hedge_recalc_interval_bars: Optional[int],
+    start_bar: int,
+):
+    """
+    Python simulation loop for the rolling hedge ratio mode.
+
+    Refits the cointegrating regression on a trailing window as the loop
+    advances, so it can't be JIT-compiled like the fixed-hedge kernel.
+
+    Returns:
+        Tuple of (trades, daily_returns, hedge_ratio, intercept, equity)
+    """
+    n = len(prices1)
+    trades: List[Trade] = []
+
+    # Preallocated; one slot per simulated bar (no list growth, and metrics
+    # consume it without another copy)
+    daily_returns = np.zeros(n - start_bar)
+
+    hedge_ratio = 0.0
+    intercept = 0.0
 
     # Initialize position state
     position = PositionState()
@@ -227,46 +639,62 @@ def run_backtest(
     # Track equity
     equity = 1.0
 
-    # Main simulation loop
-    start_bar = max(lookback_bars, hedge_ratio_lookback_bars or 0)
     last_hedge_recalc_bar = start_bar - 1  # Track when we last recalculated
 
+    # Constant per backtest; hoisted out of the per-bar loop
+    round_trip_cost = calculate_round_trip_costs(costs)
+
+    # Rolling Z-Score sums, primed on the first bar and then updated
+    # incrementally: O(N) total instead of O(N*lookback)
+    z_sum = 0.0
+    z_sum2 = 0.0
+
     for i in range(start_bar, n):
         p1 = prices1[i]
         p2 = prices2[i]
 
-        # Calculate rolling hedge ratio if enabled
-        if config.use_rolling_hedge and hedge_ratio_lookback_bars:
-            # Check if we need to recalculate hedge ratio
-            should_recalc = False
-            if hedge_recalc_interval_bars is None or hedge_recalc_interval_bars == 0:
-                # Recalculate every bar (slow but most accurate)
-                should_recalc = True
-            elif i == start_bar:
-                # Always calculate on first bar
-                should_recalc = True
-            elif (i - last_hedge_recalc_bar) >= hedge_recalc_interval_bars:
-                # Recalculate based on interval
-                should_recalc = True
-
-            if should_recalc:
-                # Get window for hedge ratio calculation
-                hr_start = max(0, i - hedge_ratio_lookback_bars + 1)
-                window_prices1 = prices1[hr_start:i + 1]
-                window_prices2 = prices2[hr_start:i + 1]
-
-                # Calculate hedge ratio on window
-                eg_result = engle_granger_test(window_prices1, window_prices2)
-                hedge_ratio = eg_result.hedge_ratio
-                intercept = eg_result.intercept
-                last_hedge_recalc_bar = i
-
-            # Update spread for current bar (using current or cached hedge ratio)
-            spread[i] = p1 - intercept - hedge_ratio * p2
-
-        # Calculate Z-Score using rolling window
-        spread_window = spread[max(0, i - lookback_bars + 1) : i + 1]
-        _, z_score, _, _ = calculate_z_score(spread_window, lookback=None)
+        # Check if we need to recalculate hedge ratio
+        should_recalc = False
+        if hedge_recalc_interval_bars is None or hedge_recalc_interval_bars == 0:
+            # Recalculate every bar (slow but most accurate)
+            should_recalc = True
+        elif i == start_bar:
+            # Always calculate on first bar
+            should_recalc = True
+        elif (i - last_hedge_recalc_bar) >= hedge_recalc_interval_bars:
+            # Recalculate based on interval
+            should_recalc = True
+
+        if should_recalc:
+            # Get window for hedge ratio calculation
+            hr_start = max(0, i - hedge_ratio_lookback_bars + 1)
+            window_prices1 = prices1[hr_start:i + 1]
+            window_prices2 = prices2[hr_start:i + 1]
+
+            # Calculate hedge ratio on window
+            eg_result = engle_granger_test(window_prices1, window_prices2)
+            hedge_ratio = eg_result.hedge_ratio
+            intercept = eg_result.intercept
+            last_hedge_recalc_bar = i
+
+        # Update spread for current bar (using current or cached hedge ratio)
+        spread[i] = p1 - intercept - hedge_ratio * p2
+
+        # Calculate Z-Score over the trailing window (sample std, ddof=1)
+        if i == start_bar:
+            for j in range(i - lookback_bars + 1, i + 1):
+                v = spread[j]
+                z_sum += v
+                z_sum2 += v * v
+        else:
+            v_new = spread[i]
+            v_old = spread[i - lookback_bars]
+            z_sum += v_new - v_old
+            z_sum2 += v_new * v_new - v_old * v_old
+
+        z_mean = z_sum / lookback_bars
+        z_var = (z_sum2 - z_sum * z_sum / lookback_bars) / (lookback_bars - 1)
+        z_score = (spread[i] - z_mean) / np.sqrt(z_var) if z_var > 0 else 0.0
 
         # === Check Exit Conditions ===
         if position.is_open:
@@ -295,17 +723,18 @@ def run_backtest(
                     exit_reason = "stop_loss"
 
             if should_exit:
-                # Calculate PnL
-                gross_pnl = calculate_pair_trade_pnl(
+                # Calculate PnL (weights once per exit, branchless signed form)
+                weight1, weight2 = calculate_pnl_weights(position.hedge_ratio)
+                gross_pnl = calculate_pair_trade_pnl_signed(
                     position.entry_price1,
                     position.entry_price2,
                     p1,
                     p2,
-                    position.hedge_ratio,
-                    position.side == "long_spread",
+                    weight1,
+                    weight2,
+                    1.0 if position.side == "long_spread" else -1.0,
                 )
 
-                round_trip_cost = calculate_round_trip_costs(costs)
                 net_pnl = gross_pnl - round_trip_cost
 
                 # Create trade record
@@ -330,21 +759,21 @@ def run_backtest(
                 # Update equity
                 equity = equity * (1 + net_pnl)
 
-                # Record return
-                daily_returns[-1] = net_pnl
+                # Record return (PnL lands in the previous bar's slot)
+                daily_returns[i - start_bar - 1] = net_pnl
 
                 # Debug logging for first 3 trades
-                if len(trades) <= 3:
-                    print(f"\n[Trade {len(trades)}] Exit:")
-                    print(f"  Side: {position.side}")
-                    print(f"  Entry Bar: {position.entry_bar}, Exit Bar: {i}")
-                    print(f"  Entry Z: {position.entry_z_score:.2f}, Exit Z: {z_score:.2f}")
-                    print(f"  Entry Prices: P1={position.entry_price1:.2f}, P2={position.entry_price2:.2f}")
-                    print(f"  Exit Prices: P1={p1:.2f}, P2={p2:.2f}")
-                    print(f"  Hedge Ratio: {position.hedge_ratio:.4f}")
-                    print(f"  Gross PnL: {gross_pnl * 100:.2f}%")
-                    print(f"  Net PnL: {net_pnl * 100:.2f}%")
-                    print(f"  Exit Reason: {exit_reason}")
+                if len(trades) <= 3 and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("\n[Trade %d] Exit:", len(trades))
+                    logger.debug("  Side: %s", position.side)
+                    logger.debug("  Entry Bar: %d, Exit Bar: %d", position.entry_bar, i)
+                    logger.debug("  Entry Z: %.2f, Exit Z: %.2f", position.entry_z_score, z_score)
+                    logger.debug("  Entry Prices: P1=%.2f, P2=%.2f", position.entry_price1, position.entry_price2)
+                    logger.debug("  Exit Prices: P1=%.2f, P2=%.2f", p1, p2)
+                    logger.debug("  Hedge Ratio: %.4f", position.hedge_ratio)
+                    logger.debug("  Gross PnL: %.2f%%", gross_pnl * 100)
+                    logger.debug("  Net PnL: %.2f%%", net_pnl * 100)
+                    logger.debug("  Exit Reason: %s", exit_reason)
 
                 # Close position
                 position.close_position()
@@ -375,24 +804,22 @@ def run_backtest(
                     equity=equity,
                 )
 
-        # Record zero return if no trade closed this bar
-        daily_returns.append(0.0)
-
     # Close any open position at end of data
     if position.is_open:
         final_p1 = prices1[n - 1]
         final_p2 = prices2[n - 1]
 
-        gross_pnl = calculate_pair_trade_pnl(
+        weight1, weight2 = calculate_pnl_weights(position.hedge_ratio)
+        gross_pnl = calculate_pair_trade_pnl_signed(
             position.entry_price1,
             position.entry_price2,
             final_p1,
             final_p2,
-            position.hedge_ratio,
-            position.side == "long_spread",
+            weight1,
+            weight2,
+            1.0 if position.side == "long_spread" else -1.0,
         )
 
-        round_trip_cost = calculate_round_trip_costs(costs)
         net_pnl = gross_pnl - round_trip_cost
 
         trade = Trade(
@@ -419,32 +846,4 @@ def run_backtest(
         # Record return
         daily_returns[-1] = net_pnl
 
-    # Build equity curve
-    equity_curve = [1.0]
-    for r in daily_returns:
-        equity_curve.append(equity_curve[-1] * (1 + r))
-
-    # Calculate metrics
-    trade_dicts = [asdict(t) for t in trades]
-    returns_array = np.array(daily_returns)
-    metrics = calculate_metrics(trade_dicts, returns_array, interval)
-
-    # Summary logging
-    print(f"\n[Backtest] Complete:")
-    print(f"  Total Trades: {len(trades)}")
-    print(f"  Win Rate: {metrics.win_rate * 100:.1f}%")
-    print(f"  Total Return: {metrics.total_return * 100:.2f}%")
-    print(f"  Profit Factor: {metrics.profit_factor:.2f}")
-    print(f"  Sharpe Ratio: {metrics.sharpe_ratio:.2f}")
-    print(f"  Max Drawdown: {metrics.max_drawdown * 100:.2f}%")
-    print(f"  Final Equity: {equity:.4f}")
-
-    return BacktestResult(
-        trades=trade_dicts,
-        equity_curve=equity_curve,
-        metrics=asdict(metrics),
-        daily_returns=daily_returns,
-        config=asdict(config),
-        hedge_ratio=hedge_ratio,
-        intercept=intercept,
-    )
+    return trades, daily_returns, hedge_ratio, intercept, equity
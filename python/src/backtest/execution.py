@@ -46,6 +46,42 @@ def calculate_round_trip_costs(costs: ExecutionCosts) -> float:
     return commissions + slippage
 
 
+def calculate_pnl_weights(hedge_ratio: float) -> Tuple[float, float]:
+    """
+    Precompute beta-neutral leg weights for a hedge ratio.
+
+    weight1 = 1/(1+|β|), weight2 = |β|/(1+|β|)
+
+    Constant for the life of a trade (or the whole backtest with a static
+    hedge ratio), so callers should compute these once instead of per exit.
+    """
+    abs_hedge_ratio = abs(hedge_ratio)
+    weight1 = 1 / (1 + abs_hedge_ratio)
+    weight2 = abs_hedge_ratio / (1 + abs_hedge_ratio)
+    return weight1, weight2
+
+
+def calculate_pair_trade_pnl_signed(
+    entry_price1: float,
+    entry_price2: float,
+    exit_price1: float,
+    exit_price2: float,
+    weight1: float,
+    weight2: float,
+    sign: float,
+) -> float:
+    """
+    Branchless form of calculate_pair_trade_pnl.
+
+    `sign` is +1 for long spread, -1 for short spread; weights come from
+    calculate_pnl_weights. Negation is exact in floating point, so this
+    matches the branching version bit for bit.
+    """
+    return1 = (exit_price1 - entry_price1) / entry_price1
+    return2 = (exit_price2 - entry_price2) / entry_price2
+    return sign * (weight1 * return1 - weight2 * return2)
+
+
 def calculate_pair_trade_pnl(
     entry_price1: float,
     entry_price2: float,
@@ -77,21 +113,18 @@ def calculate_pair_trade_pnl(
     Returns:
         PnL as percentage
     """
-    # Calculate returns for each leg
-    return1 = (exit_price1 - entry_price1) / entry_price1
-    return2 = (exit_price2 - entry_price2) / entry_price2
-
-    # Normalize by position weights (beta-neutral with equal risk contribution)
-    abs_hedge_ratio = abs(hedge_ratio)
-    weight1 = 1 / (1 + abs_hedge_ratio)
-    weight2 = abs_hedge_ratio / (1 + abs_hedge_ratio)
-
     # Long spread: profit when spread widens (asset1 outperforms asset2)
     # Short spread: profit when spread narrows (asset2 outperforms asset1)
-    if is_long_spread:
-        return weight1 * return1 - weight2 * return2
-    else:
-        return weight2 * return2 - weight1 * return1
+    weight1, weight2 = calculate_pnl_weights(hedge_ratio)
+    return calculate_pair_trade_pnl_signed(
+        entry_price1,
+        entry_price2,
+        exit_price1,
+        exit_price2,
+        weight1,
+        weight2,
+        1.0 if is_long_spread else -1.0,
+    )
 
 
 def apply_trade_costs(gross_pnl_pct: float, costs: ExecutionCosts) -> float:
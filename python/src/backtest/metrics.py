@@ -6,11 +6,25 @@ Calculate backtest performance metrics: Sharpe, Sortino, Calmar, etc.
 
 import numpy as np
 import pandas as pd
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Optional
 from dataclasses import dataclass
 
+from .cointegration import INTERVAL_MINUTES
 
-@dataclass
+MINUTES_PER_YEAR = 365 * 24 * 60
+
+# Periods per year for known intervals, precomputed at import so the hot
+# paths do a dict lookup instead of string parsing
+ANNUALIZATION_FACTORS = {
+    interval: MINUTES_PER_YEAR / minutes
+    for interval, minutes in INTERVAL_MINUTES.items()
+}
+# Weekly bars annualize on 52 trading weeks, matching the parser fallback
+ANNUALIZATION_FACTORS["1w"] = 52.0
+
+
+@dataclass(slots=True)
 class BacktestMetrics:
     """Backtest performance metrics"""
 
@@ -54,40 +68,59 @@ def calculate_metrics(
     if total_trades == 0:
         return _empty_metrics()
 
-    # Extract PnLs
-    pnls = np.array([t["pnl_net"] for t in trades])
-    winning_pnls = pnls[pnls > 0]
-    losing_pnls = pnls[pnls < 0]
+    # Extract PnLs without intermediate Python lists, then share one win/loss
+    # mask across all reductions (masked `where=` reductions avoid the
+    # boolean-index copies the old code made for each statistic)
+    pnls = np.fromiter(
+        (t["pnl_net"] for t in trades), dtype=np.float64, count=total_trades
+    )
+    win_mask = pnls > 0
+    loss_mask = pnls < 0
+
+    # total_trades > 0 is guaranteed by the early return above, and the
+    # where=/initial= reductions are well-defined on empty masks, so no
+    # emptiness guards are needed on the sums and extrema
+    winning_trades = int(win_mask.sum())
+    losing_trades = int(loss_mask.sum())
+    win_rate = winning_trades / total_trades
 
-    winning_trades = len(winning_pnls)
-    losing_trades = len(losing_pnls)
-    win_rate = winning_trades / total_trades if total_trades > 0 else 0.0
+    gross_profit = pnls.sum(where=win_mask)
+    gross_loss = abs(pnls.sum(where=loss_mask))
 
-    # Average wins/losses
-    avg_win = np.mean(winning_pnls) if len(winning_pnls) > 0 else 0.0
-    avg_loss = np.mean(losing_pnls) if len(losing_pnls) > 0 else 0.0
+    # Average wins/losses (division still needs the count checks)
+    avg_win = gross_profit / winning_trades if winning_trades > 0 else 0.0
+    avg_loss = -gross_loss / losing_trades if losing_trades > 0 else 0.0
 
     # Max win/loss
-    max_win = np.max(winning_pnls) if len(winning_pnls) > 0 else 0.0
-    max_loss = np.min(losing_pnls) if len(losing_pnls) > 0 else 0.0
+    max_win = pnls.max(initial=0.0, where=win_mask)
+    max_loss = pnls.min(initial=0.0, where=loss_mask)
 
     # Profit factor
-    gross_profit = np.sum(winning_pnls) if len(winning_pnls) > 0 else 0.0
-    gross_loss = abs(np.sum(losing_pnls)) if len(losing_pnls) > 0 else 0.0
     profit_factor = gross_profit / gross_loss if gross_loss > 0 else float("inf")
 
     # Holding period
-    holding_periods = [t["holding_period"] for t in trades]
-    avg_holding_period = np.mean(holding_periods) if holding_periods else 0.0
+    holding_periods = np.fromiter(
+        (t["holding_period"] for t in trades), dtype=np.int64, count=total_trades
+    )
+    avg_holding_period = holding_periods.mean()
 
-    # Total return
-    total_return = np.prod(1 + daily_returns) - 1
+    # Total return in log space: one pass, and log1p/expm1 stay accurate for
+    # long intraday series where np.prod(1 + r) would under/overflow
+    total_return = float(np.expm1(np.log1p(daily_returns).sum()))
 
-    # Risk metrics
-    sharpe = calculate_sharpe_ratio(daily_returns, interval)
-    sortino = calculate_sortino_ratio(daily_returns, interval)
+    # Risk metrics (resolve the annualization factor once and pass it down,
+    # along with the already-computed total return)
+    ann_factor = get_annualization_factor(interval)
+    sharpe = calculate_sharpe_ratio(daily_returns, interval, ann_factor=ann_factor)
+    sortino = calculate_sortino_ratio(daily_returns, interval, ann_factor=ann_factor)
     max_dd, max_dd_duration = calculate_max_drawdown(daily_returns)
-    calmar = calculate_calmar_ratio(daily_returns, max_dd, interval)
+    calmar = calculate_calmar_ratio(
+        daily_returns,
+        max_dd,
+        interval,
+        ann_factor=ann_factor,
+        total_return=total_return,
+    )
 
     return BacktestMetrics(
         total_return=total_return,
@@ -109,7 +142,11 @@ def calculate_metrics(
     )
 
 
-def calculate_sharpe_ratio(returns: np.ndarray, interval: str = "1d") -> float:
+def calculate_sharpe_ratio(
+    returns: np.ndarray,
+    interval: str = "1d",
+    ann_factor: Optional[float] = None,
+) -> float:
     """
     Calculate annualized Sharpe ratio
 
@@ -118,6 +155,7 @@ def calculate_sharpe_ratio(returns: np.ndarray, interval: str = "1d") -> float:
     Args:
         returns: Array of returns per bar
         interval: Bar interval for annualization
+        ann_factor: Pre-resolved annualization factor (skips interval lookup)
 
     Returns:
         Annualized Sharpe ratio
@@ -131,8 +169,8 @@ def calculate_sharpe_ratio(returns: np.ndarray, interval: str = "1d") -> float:
     if std_return == 0:
         return 0.0
 
-    # Get annualization factor
-    ann_factor = get_annualization_factor(interval)
+    if ann_factor is None:
+        ann_factor = get_annualization_factor(interval)
 
     # Annualized Sharpe
     sharpe = (mean_return * ann_factor) / (std_return * np.sqrt(ann_factor))
@@ -144,6 +182,7 @@ def calculate_sortino_ratio(
     returns: np.ndarray,
     interval: str = "1d",
     target_return: float = 0.0,
+    ann_factor: Optional[float] = None,
 ) -> float:
     """
     Calculate annualized Sortino ratio
@@ -154,6 +193,7 @@ def calculate_sortino_ratio(
         returns: Array of returns per bar
         interval: Bar interval for annualization
         target_return: Target return (default 0)
+        ann_factor: Pre-resolved annualization factor (skips interval lookup)
 
     Returns:
         Annualized Sortino ratio
@@ -174,8 +214,8 @@ def calculate_sortino_ratio(
     if downside_std == 0:
         return 0.0
 
-    # Get annualization factor
-    ann_factor = get_annualization_factor(interval)
+    if ann_factor is None:
+        ann_factor = get_annualization_factor(interval)
 
     # Annualized Sortino
     sortino = (mean_return * ann_factor) / (downside_std * np.sqrt(ann_factor))
@@ -196,28 +236,27 @@ def calculate_max_drawdown(returns: np.ndarray) -> tuple[float, int]:
     if len(returns) == 0:
         return 0.0, 0
 
-    # Build equity curve
-    equity = np.cumprod(1 + returns)
-
-    # Calculate running maximum
-    running_max = np.maximum.accumulate(equity)
-
-    # Calculate drawdown at each point
-    drawdown = (equity - running_max) / running_max
+    # Two reusable buffers instead of a fresh temporary per step: buf1 goes
+    # equity -> drawdown in place, buf2 holds the running maximum
+    buf1 = np.add(1.0, returns, dtype=np.float64)
+    np.cumprod(buf1, out=buf1)  # Equity curve
+    buf2 = np.empty_like(buf1)
+    np.maximum.accumulate(buf1, out=buf2)  # Running maximum
+    np.divide(buf1, buf2, out=buf1)
+    buf1 -= 1.0  # Drawdown: equity / running_max - 1
+    drawdown = buf1
 
     # Maximum drawdown
     max_dd = abs(np.min(drawdown))
 
-    # Calculate drawdown duration
-    max_dd_duration = 0
-    current_dd_duration = 0
-
-    for dd in drawdown:
-        if dd < 0:
-            current_dd_duration += 1
-            max_dd_duration = max(max_dd_duration, current_dd_duration)
-        else:
-            current_dd_duration = 0
+    # Drawdown duration via run-length encoding: find where underwater
+    # stretches start (+1) and end (-1) and take the longest run, instead of
+    # walking the curve bar by bar in Python
+    in_dd = drawdown < 0
+    transitions = np.diff(in_dd.astype(np.int8), prepend=0, append=0)
+    starts = np.where(transitions == 1)[0]
+    ends = np.where(transitions == -1)[0]
+    max_dd_duration = int((ends - starts).max()) if starts.size else 0
 
     return max_dd, max_dd_duration
 
@@ -226,6 +265,8 @@ def calculate_calmar_ratio(
     returns: np.ndarray,
     max_drawdown: float,
     interval: str = "1d",
+    ann_factor: Optional[float] = None,
+    total_return: Optional[float] = None,
 ) -> float:
     """
     Calculate Calmar ratio
@@ -238,6 +279,8 @@ def calculate_calmar_ratio(
         returns: Array of returns per bar
         max_drawdown: Maximum drawdown as percentage
         interval: Bar interval for annualization
+        ann_factor: Pre-resolved annualization factor (skips interval lookup)
+        total_return: Pre-computed total return (skips the pass over returns)
 
     Returns:
         Calmar ratio
@@ -246,8 +289,10 @@ def calculate_calmar_ratio(
         return 0.0
 
     # Calculate annualized return
-    total_return = np.prod(1 + returns) - 1
-    ann_factor = get_annualization_factor(interval)
+    if total_return is None:
+        total_return = np.expm1(np.log1p(returns).sum())
+    if ann_factor is None:
+        ann_factor = get_annualization_factor(interval)
     periods = len(returns)
 
     if periods == 0:
@@ -262,6 +307,7 @@ def calculate_calmar_ratio(
     return calmar
 
 
+@lru_cache(maxsize=32)
 def get_annualization_factor(interval: str) -> float:
     """
     Get annualization factor for a given interval
@@ -278,6 +324,10 @@ def get_annualization_factor(interval: str) -> float:
         '1h' → 8760 (365 * 24)
         '1d' → 365
     """
+    factor = ANNUALIZATION_FACTORS.get(interval)
+    if factor is not None:
+        return factor
+
     interval = interval.lower().strip()
 
     # Minute intervals
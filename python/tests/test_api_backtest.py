@@ -0,0 +1,109 @@
+"""
+Regression tests for the backtest API routes.
+"""
+
+import json
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from src.api.main import app
+from src.api.routes.backtest import STREAM_EQUITY_THRESHOLD
+
+
+def test_run_streams_large_equity_curves_as_valid_json():
+    """
+    Responses whose equity curve exceeds STREAM_EQUITY_THRESHOLD are
+    streamed chunk-wise. The head of the streamed body carries numpy
+    scalars (metrics, hedge ratio), which used to be dumped without
+    OPT_SERIALIZE_NUMPY — orjson raised mid-stream, after the 200 headers
+    were already out, and the client got a truncated body.
+    """
+    n = STREAM_EQUITY_THRESHOLD + 10_000
+    rng = np.random.default_rng(42)
+    x = np.cumsum(rng.normal(0, 1, n)) + 1000
+    y = 2 * x + 5 + rng.normal(0, 2, n)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/backtest/run",
+            json={
+                "symbol1": "AAA",
+                "symbol2": "BBB",
+                "prices1": y.tolist(),
+                "prices2": x.tolist(),
+                "lookbackDays": 90,
+                "interval": "1h",
+            },
+        )
+
+    assert response.status_code == 200
+    body = response.json()  # Fails on a truncated stream
+    assert body["success"] is True
+    assert len(body["equity_curve"]) > STREAM_EQUITY_THRESHOLD
+    assert isinstance(body["hedge_ratio"], float)
+    assert isinstance(body["metrics"]["total_return"], float)
+
+
+def test_run_binary_accepts_float32_payloads():
+    """
+    /run-binary builds read-only zero-copy views with np.frombuffer. The
+    kernel signatures used to accept only writable float32 arrays, so every
+    float32 binary request failed with a no-matching-definition 500.
+    """
+    n = 2000
+    rng = np.random.default_rng(7)
+    x = (np.cumsum(rng.normal(0, 1, n)) + 1000).astype(np.float32)
+    y = (2 * x + 5 + rng.normal(0, 2, n)).astype(np.float32)
+
+    meta = {
+        "symbol1": "AAA",
+        "symbol2": "BBB",
+        "lookbackDays": 90,
+        "interval": "1h",
+        "prices1Length": n,
+        "dtype": "float32",
+    }
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/backtest/run-binary",
+            content=y.tobytes() + x.tobytes(),
+            headers={
+                "Content-Type": "application/octet-stream",
+                "X-Backtest-Config": json.dumps(meta),
+            },
+        )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["success"] is True
+    assert body["metrics"]["total_trades"] > 0
+
+
+def test_run_binary_rejects_unknown_dtype_with_400():
+    """
+    An unrecognized dtype string used to reach np.dtype(), which raises
+    TypeError and surfaced as a 500 instead of the 400 validation error.
+    """
+    meta = {
+        "symbol1": "AAA",
+        "symbol2": "BBB",
+        "lookbackDays": 90,
+        "interval": "1h",
+        "prices1Length": 4,
+        "dtype": "garbage",
+    }
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/backtest/run-binary",
+            content=b"\x00" * 64,
+            headers={
+                "Content-Type": "application/octet-stream",
+                "X-Backtest-Config": json.dumps(meta),
+            },
+        )
+
+    assert response.status_code == 400
+    assert "dtype" in response.json()["detail"]
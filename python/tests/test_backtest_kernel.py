@@ -0,0 +1,113 @@
+"""
+Regression tests for the backtest kernel.
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+
+from src.backtest import run_backtest, BacktestConfig
+
+
+def test_oscillating_spread_does_not_overrun_trade_buffers():
+    """
+    An aggressive config on an oscillating spread can exit and re-enter on
+    almost every bar, approaching one trade per simulated bar. The kernel's
+    trade arrays used to be sized n_bars // 2 + 2, which this overran —
+    with Numba bounds checking off that was an out-of-bounds native write
+    (hard crash). The arrays must fit one trade per bar plus the
+    end-of-data close.
+    """
+    n = 2000
+    prices1 = 100.0 + np.where(np.arange(n) % 2 == 0, 1.0, -1.0)
+    prices2 = np.ones(n)
+
+    config = BacktestConfig(
+        entry_threshold=0.5,
+        exit_threshold=0.0,
+        force_hedge_ratio=0.0,  # Spread collapses to prices1
+        force_intercept=100.0,
+    )
+
+    result = run_backtest(prices1, prices2, "1h", config)
+
+    n_bars = n - 24  # 24h lookback at 1h bars
+    n_trades = len(result.trades)
+
+    # The point of the regression: well past the old n_bars // 2 + 2 cap
+    assert n_trades > n_bars // 2 + 2
+    assert n_trades <= n_bars + 1
+
+    assert len(result.daily_returns) == n_bars
+    assert len(result.equity_curve) == n_bars + 1
+    assert result.metrics["total_trades"] == n_trades
+
+
+def test_float64_kernels_accept_readonly_arrays():
+    """
+    build_spread and calculate_z_score feed float64 kernels whose signatures
+    used to accept only writable arrays. np.ascontiguousarray preserves
+    read-onlyness for an already-contiguous float64 input, so read-only
+    views (np.frombuffer, arrays with the writeable flag cleared) raised a
+    no-matching-definition TypeError.
+    """
+    from src.backtest.cointegration import build_spread, calculate_z_score
+
+    n = 500
+    rng = np.random.default_rng(3)
+    x = np.cumsum(rng.normal(0, 1, n)) + 1000
+    y = 2 * x + 5 + rng.normal(0, 2, n)
+
+    y_ro = np.frombuffer(y.tobytes(), dtype=np.float64)
+    x_ro = np.frombuffer(x.tobytes(), dtype=np.float64)
+    assert not y_ro.flags.writeable
+
+    spread = build_spread(y_ro, x_ro, 2.0, 5.0)
+    np.testing.assert_allclose(spread, y - 5.0 - 2.0 * x)
+
+    spread.flags.writeable = False
+    z_score, current, mean, std = calculate_z_score(spread, lookback=50)
+    assert len(z_score) == n
+    assert np.isfinite(current)
+
+
+def test_process_pool_batch_completes_and_exits():
+    """
+    Importing the kernels initializes Numba's native threading layer (the
+    batch kernel is parallel=True). With the default fork start method the
+    pool workers inherited that state and the parent hung at interpreter
+    shutdown, so sweep scripts never terminated. The pool must use a spawn
+    context; this runs a batch in a fresh interpreter and requires it to
+    exit on its own.
+    """
+    script = textwrap.dedent(
+        """
+        import numpy as np
+        from src.backtest import run_backtests_batch
+
+        rng = np.random.default_rng(0)
+        x = np.cumsum(rng.normal(0, 1, 500)) + 1000
+        y = 2 * x + 5 + rng.normal(0, 2, 500)
+        jobs = [(y, x, "1h", None), (y, x, "1h", None)]
+
+        results = run_backtests_batch(jobs, max_workers=2)
+        assert len(results) == 2
+        print("BATCH_OK")
+        """
+    )
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=root,
+        env={**os.environ, "PYTHONPATH": root},
+        capture_output=True,
+        text=True,
+        timeout=120,  # Hangs forever with a fork-context pool
+    )
+
+    assert proc.returncode == 0, proc.stderr
+    assert "BATCH_OK" in proc.stdout